@@ -0,0 +1,23 @@
+"""Optional mypyc build for the trade-processing hot path.
+
+The bot runs fine as plain Python. To compile the hot modules to C
+extensions in place (``src/*.so`` next to the sources)::
+
+    pip install "mypy[mypyc]"
+    python setup.py build_ext --inplace
+
+``src/main.py`` is left interpreted: it is the ``python -m src.main``
+entry point, which cannot be an extension module.
+"""
+
+from setuptools import setup
+from mypyc.build import mypycify
+
+setup(
+    name="polymarket-whale-watcher",
+    packages=["src"],
+    ext_modules=mypycify([
+        "src/store.py",
+        "src/polymarket.py",
+    ]),
+)
@@ -1,17 +1,58 @@
 """Configuration management for the PolyMarket Whale Watcher bot."""
 
-import json
 import logging
 import os
-from typing import List
+from typing import Callable, Dict, FrozenSet, Iterable, List, Optional, Tuple
 from dotenv import load_dotenv
 
+from . import jsonutil
+
+try:
+    import ahocorasick
+except ImportError:  # pragma: no cover - optional speedup
+    ahocorasick = None
+
 # Load environment variables from .env file
 load_dotenv()
 
 logger = logging.getLogger(__name__)
 
 
+def _normalize(items: Iterable[str], lower: bool = False) -> Tuple[str, ...]:
+    """Strip (and optionally lowercase) items in one pass, dropping empties."""
+    if lower:
+        return tuple(item for item in (str(raw).strip().lower() for raw in items) if item)
+    return tuple(item for item in (str(raw).strip() for raw in items) if item)
+
+
+def _parse_csv(value: str, lower: bool = False) -> Tuple[str, ...]:
+    """Split a comma-separated environment value into normalized items."""
+    return _normalize(value.split(","), lower)
+
+
+def _build_text_matcher(text_filters: Tuple[str, ...]) -> Optional[Callable[[str], bool]]:
+    """Build a predicate telling whether any filter occurs in a text.
+    
+    Uses a single Aho-Corasick automaton when pyahocorasick is available so
+    each text is scanned once regardless of the number of filters.
+    
+    Args:
+        text_filters: Lowercase substrings to look for
+        
+    Returns:
+        Matcher callable, or None if no filters are configured
+    """
+    if not text_filters:
+        return None
+    if ahocorasick is None:
+        return lambda text: any(text_filter in text for text_filter in text_filters)
+    automaton = ahocorasick.Automaton()
+    for text_filter in text_filters:
+        automaton.add_word(text_filter, text_filter)
+    automaton.make_automaton()
+    return lambda text: next(automaton.iter(text), None) is not None
+
+
 class Config:
     """Configuration class for the bot."""
     
@@ -20,9 +61,16 @@ class Config:
         # Telegram configuration
         self.telegram_bot_token: str = os.getenv("TELEGRAM_BOT_TOKEN", "")
         self.telegram_chat_id: str = os.getenv("TELEGRAM_CHAT_ID", "")
+        # Discard commands sent while the bot was offline (PTB persistence
+        # does not keep the getUpdates offset, so this is the only knob)
+        self.drop_pending_updates: bool = (
+            os.getenv("DROP_PENDING_UPDATES", "true").strip().lower() not in ("0", "false", "no")
+        )
         
         # Persistent state file
         self.state_file: str = os.getenv("CONFIG_STATE_FILE", "config_state.json")
+        # Called with the changed attribute name after every mutation
+        self._subscribers: List[Callable[[str], None]] = []
         
         # Polling configuration
         self.poll_interval: int = int(os.getenv("POLL_INTERVAL", "60"))
@@ -30,43 +78,43 @@ class Config:
         self.heartbeat_interval: int = max(60, int(os.getenv("HEARTBEAT_INTERVAL", "600")))
         
         # Whale addresses (bootstrap list)
-        whale_addresses_str = os.getenv("WHALE_ADDRESSES", "")
-        self.whale_addresses: List[str] = [
-            addr.strip().lower() for addr in whale_addresses_str.split(",") if addr.strip()
-        ]
+        self.whale_addresses: Dict[str, None] = dict.fromkeys(
+            _parse_csv(os.getenv("WHALE_ADDRESSES", ""), lower=True)
+        )
         
         # Market filters
-        market_ids_str = os.getenv("MARKET_IDS", "")
-        self.market_ids: List[str] = [
-            mid.strip() for mid in market_ids_str.split(",") if mid.strip()
-        ]
-        
-        market_text_str = os.getenv("MARKET_TEXT_FILTERS", "")
-        self.market_text_filters: List[str] = [
-            text.strip().lower() for text in market_text_str.split(",") if text.strip()
-        ]
+        self.market_ids: Dict[str, None] = dict.fromkeys(_parse_csv(os.getenv("MARKET_IDS", "")))
+        self.market_text_filters: Dict[str, None] = dict.fromkeys(
+            _parse_csv(os.getenv("MARKET_TEXT_FILTERS", ""), lower=True)
+        )
         
         # Exclusion filters
-        exclude_market_ids_str = os.getenv("EXCLUDE_MARKET_IDS", "")
-        self.exclude_market_ids: List[str] = [
-            mid.strip().lower() for mid in exclude_market_ids_str.split(",") if mid.strip()
-        ]
-        
-        exclude_text_str = os.getenv("EXCLUDE_MARKET_TEXT_FILTERS", "")
-        self.exclude_market_text_filters: List[str] = [
-            text.strip().lower() for text in exclude_text_str.split(",") if text.strip()
-        ]
+        self.exclude_market_ids: Dict[str, None] = dict.fromkeys(
+            _parse_csv(os.getenv("EXCLUDE_MARKET_IDS", ""), lower=True)
+        )
+        self.exclude_market_text_filters: Dict[str, None] = dict.fromkeys(
+            _parse_csv(os.getenv("EXCLUDE_MARKET_TEXT_FILTERS", ""), lower=True)
+        )
         
         self._load_state()
+        self._refresh_lookups()
         self._validate()
     
+    def _refresh_lookups(self):
+        """Rebuild the immutable filter views used on the trade hot path."""
+        self.market_ids_set: FrozenSet[str] = frozenset(mid.lower() for mid in self.market_ids)
+        self.market_text_filters_tuple: Tuple[str, ...] = tuple(self.market_text_filters)
+        self.exclude_market_ids_set: FrozenSet[str] = frozenset(self.exclude_market_ids)
+        self.exclude_market_text_filters_tuple: Tuple[str, ...] = tuple(self.exclude_market_text_filters)
+        self.market_text_matcher = _build_text_matcher(self.market_text_filters_tuple)
+        self.exclude_market_text_matcher = _build_text_matcher(self.exclude_market_text_filters_tuple)
+    
     def _load_state(self):
         """Load persisted state from disk if available."""
         if not os.path.exists(self.state_file):
             return
         try:
-            with open(self.state_file, "r", encoding="utf-8") as f:
-                data = json.load(f)
+            data = jsonutil.load_file(self.state_file)
         except Exception as exc:
             logger.warning("Could not load config state from %s: %s", self.state_file, exc)
             return
@@ -76,19 +124,19 @@ class Config:
         self.heartbeat_interval = max(60, int(data.get("heartbeat_interval", self.heartbeat_interval)))
         persisted_whales = data.get("whale_addresses")
         if isinstance(persisted_whales, list):
-            self.whale_addresses = [addr.strip().lower() for addr in persisted_whales if addr]
+            self.whale_addresses = dict.fromkeys(_normalize(persisted_whales, lower=True))
         persisted_market_ids = data.get("market_ids")
         if isinstance(persisted_market_ids, list):
-            self.market_ids = [mid.strip() for mid in persisted_market_ids if mid]
+            self.market_ids = dict.fromkeys(_normalize(persisted_market_ids))
         persisted_market_texts = data.get("market_text_filters")
         if isinstance(persisted_market_texts, list):
-            self.market_text_filters = [text.strip().lower() for text in persisted_market_texts if text]
+            self.market_text_filters = dict.fromkeys(_normalize(persisted_market_texts, lower=True))
         persisted_exclude_market_ids = data.get("exclude_market_ids")
         if isinstance(persisted_exclude_market_ids, list):
-            self.exclude_market_ids = [mid.strip().lower() for mid in persisted_exclude_market_ids if mid]
+            self.exclude_market_ids = dict.fromkeys(_normalize(persisted_exclude_market_ids, lower=True))
         persisted_exclude_texts = data.get("exclude_market_text_filters")
         if isinstance(persisted_exclude_texts, list):
-            self.exclude_market_text_filters = [text.strip().lower() for text in persisted_exclude_texts if text]
+            self.exclude_market_text_filters = dict.fromkeys(_normalize(persisted_exclude_texts, lower=True))
     
     def _save_state(self):
         """Persist mutable settings to disk."""
@@ -96,31 +144,51 @@ class Config:
             "poll_interval": self.poll_interval,
             "min_trade_value": self.min_trade_value,
             "heartbeat_interval": self.heartbeat_interval,
-            "whale_addresses": self.whale_addresses,
-            "market_ids": self.market_ids,
-            "market_text_filters": self.market_text_filters,
-            "exclude_market_ids": self.exclude_market_ids,
-            "exclude_market_text_filters": self.exclude_market_text_filters,
+            "whale_addresses": list(self.whale_addresses),
+            "market_ids": list(self.market_ids),
+            "market_text_filters": list(self.market_text_filters),
+            "exclude_market_ids": list(self.exclude_market_ids),
+            "exclude_market_text_filters": list(self.exclude_market_text_filters),
         }
         try:
-            with open(self.state_file, "w", encoding="utf-8") as f:
-                json.dump(data, f, indent=2)
+            with open(self.state_file, "wb") as f:
+                f.write(jsonutil.dumps(data, indent=True))
         except Exception as exc:
             logger.error("Failed to save config state to %s: %s", self.state_file, exc)
     
+    def subscribe(self, callback: Callable[[str], None]) -> None:
+        """Register a callback for config changes.
+        
+        Args:
+            callback: Called with the name of the changed attribute
+        """
+        self._subscribers.append(callback)
+    
+    def _changed(self, field: str) -> None:
+        """Persist a mutation and tell subscribers which attribute changed."""
+        self._save_state()
+        for callback in self._subscribers:
+            callback(field)
+    
     def _validate(self):
         """Validate required configuration."""
         if not self.telegram_bot_token:
             raise ValueError("TELEGRAM_BOT_TOKEN is required")
         if not self.telegram_chat_id:
             raise ValueError("TELEGRAM_CHAT_ID is required")
+        try:
+            int(self.telegram_chat_id)
+        except ValueError:
+            raise ValueError(
+                f"TELEGRAM_CHAT_ID must be a numeric chat id, got {self.telegram_chat_id!r}"
+            ) from None
     
     def add_whale_address(self, address: str) -> bool:
         """Add a whale address to track."""
         address = address.strip().lower()
         if address and address not in self.whale_addresses:
-            self.whale_addresses.append(address)
-            self._save_state()
+            self.whale_addresses[address] = None
+            self._changed("whale_addresses")
             return True
         return False
     
@@ -128,8 +196,8 @@ class Config:
         """Remove a whale address from tracking."""
         address = address.strip().lower()
         if address in self.whale_addresses:
-            self.whale_addresses.remove(address)
-            self._save_state()
+            del self.whale_addresses[address]
+            self._changed("whale_addresses")
             return True
         return False
     
@@ -137,8 +205,9 @@ class Config:
         """Add a market ID filter."""
         market_id = market_id.strip()
         if market_id and market_id not in self.market_ids:
-            self.market_ids.append(market_id)
-            self._save_state()
+            self.market_ids[market_id] = None
+            self._refresh_lookups()
+            self._changed("market_ids")
             return True
         return False
     
@@ -146,8 +215,9 @@ class Config:
         """Remove a market ID filter."""
         market_id = market_id.strip()
         if market_id in self.market_ids:
-            self.market_ids.remove(market_id)
-            self._save_state()
+            del self.market_ids[market_id]
+            self._refresh_lookups()
+            self._changed("market_ids")
             return True
         return False
     
@@ -155,8 +225,9 @@ class Config:
         """Add a market text filter."""
         text = text.strip().lower()
         if text and text not in self.market_text_filters:
-            self.market_text_filters.append(text)
-            self._save_state()
+            self.market_text_filters[text] = None
+            self._refresh_lookups()
+            self._changed("market_text_filters")
             return True
         return False
     
@@ -164,32 +235,34 @@ class Config:
         """Remove a market text filter."""
         text = text.strip().lower()
         if text in self.market_text_filters:
-            self.market_text_filters.remove(text)
-            self._save_state()
+            del self.market_text_filters[text]
+            self._refresh_lookups()
+            self._changed("market_text_filters")
             return True
         return False
     
     def set_min_trade_value(self, value: float) -> None:
         """Set the minimum trade value filter."""
         self.min_trade_value = max(0, value)
-        self._save_state()
+        self._changed("min_trade_value")
     
     def set_poll_interval(self, interval: int) -> None:
         """Set the poll interval in seconds."""
         self.poll_interval = max(10, interval)
-        self._save_state()
+        self._changed("poll_interval")
     
     def set_heartbeat_interval(self, interval: int) -> None:
         """Set the heartbeat interval in seconds."""
         self.heartbeat_interval = max(60, interval)
-        self._save_state()
+        self._changed("heartbeat_interval")
     
     def add_exclude_market_id(self, market_id: str) -> bool:
         """Add a market ID to the exclusion list."""
         market_id = market_id.strip().lower()
         if market_id and market_id not in self.exclude_market_ids:
-            self.exclude_market_ids.append(market_id)
-            self._save_state()
+            self.exclude_market_ids[market_id] = None
+            self._refresh_lookups()
+            self._changed("exclude_market_ids")
             return True
         return False
     
@@ -197,8 +270,9 @@ class Config:
         """Remove a market ID from the exclusion list."""
         market_id = market_id.strip().lower()
         if market_id in self.exclude_market_ids:
-            self.exclude_market_ids.remove(market_id)
-            self._save_state()
+            del self.exclude_market_ids[market_id]
+            self._refresh_lookups()
+            self._changed("exclude_market_ids")
             return True
         return False
     
@@ -206,8 +280,9 @@ class Config:
         """Add a text filter to the exclusion list."""
         text = text.strip().lower()
         if text and text not in self.exclude_market_text_filters:
-            self.exclude_market_text_filters.append(text)
-            self._save_state()
+            self.exclude_market_text_filters[text] = None
+            self._refresh_lookups()
+            self._changed("exclude_market_text_filters")
             return True
         return False
     
@@ -215,8 +290,9 @@ class Config:
         """Remove a text filter from the exclusion list."""
         text = text.strip().lower()
         if text in self.exclude_market_text_filters:
-            self.exclude_market_text_filters.remove(text)
-            self._save_state()
+            del self.exclude_market_text_filters[text]
+            self._refresh_lookups()
+            self._changed("exclude_market_text_filters")
             return True
         return False
 
@@ -0,0 +1,85 @@
+"""JSON helpers backed by orjson, falling back to the stdlib json module."""
+
+import mmap
+import os
+from typing import Any, List, Union
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None  # type: ignore[assignment]
+    import json
+
+# Files larger than this are parsed from a read-only memory map
+MMAP_THRESHOLD = 64 * 1024
+
+
+def loads(data: Union[bytes, bytearray, memoryview, str]) -> Any:
+    """Deserialize JSON from bytes or str."""
+    if orjson is not None:
+        return orjson.loads(data)
+    if isinstance(data, memoryview):
+        data = data.tobytes()
+    return json.loads(data)
+
+
+def dumps(obj: Any, indent: bool = False) -> bytes:
+    """Serialize an object to UTF-8 encoded JSON bytes.
+    
+    Args:
+        obj: Object to serialize
+        indent: Pretty-print with two-space indentation
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    return json.dumps(obj, indent=2 if indent else None).encode("utf-8")
+
+
+def dumps_line(obj: Any) -> bytes:
+    """Serialize an object to a single newline-terminated JSON line."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_APPEND_NEWLINE)
+    return json.dumps(obj, separators=(",", ":")).encode("utf-8") + b"\n"
+
+
+def loads_lines(data: bytes) -> List[Any]:
+    """Deserialize newline-delimited JSON.
+    
+    All lines are parsed in a single call by rewriting the buffer into a
+    JSON array. If that fails (e.g. a torn last line), lines are parsed one
+    by one and unparseable lines are skipped.
+    
+    Args:
+        data: JSON Lines content
+    """
+    data = data.rstrip(b"\n")
+    if not data:
+        return []
+    try:
+        return loads(b"[" + data.replace(b"\n", b",") + b"]")
+    except ValueError:
+        pass
+    items = []
+    for line in data.split(b"\n"):
+        try:
+            items.append(loads(line))
+        except ValueError:
+            continue
+    return items
+
+
+def load_file(path: str) -> Any:
+    """Read and deserialize a JSON file.
+    
+    Small files are read in one go; files above ``MMAP_THRESHOLD`` are
+    memory-mapped and parsed from the mapping to avoid an extra copy.
+    
+    Args:
+        path: Path to the JSON file
+    """
+    with open(path, "rb") as f:
+        if os.path.getsize(path) <= MMAP_THRESHOLD:
+            return loads(f.read())
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            with memoryview(mm) as view:
+                return loads(view)
@@ -1,21 +1,45 @@
 ﻿"""Main entry point for the PolyMarket Whale Watcher bot."""
 
 import asyncio
+import atexit
 import logging
+import queue
 import sys
 import time
-from typing import Dict, Any, Optional
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Set
 
 from .config import config
 from .store import trade_store
 from .polymarket import PolyMarketAPI
 from .telegram_bot import TelegramBot
 
+
+def _setup_logging() -> QueueListener:
+    """Configure logging so records are written to stderr off the event loop.
+    
+    The root logger only enqueues records; a QueueListener thread formats
+    them and does the blocking stream writes.
+    
+    Returns:
+        The started listener, stopped again at interpreter exit
+    """
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(
+        logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    )
+    log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    root = logging.getLogger()
+    root.setLevel(logging.INFO)
+    root.addHandler(QueueHandler(log_queue))
+    listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
+
+
 # Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+_setup_logging()
 logger = logging.getLogger(__name__)
 
 
@@ -40,7 +64,7 @@ class WhaleWatcher:
             f"New notifications in last poll: {new_trades_count}\n"
             f"Poll interval: {config.poll_interval}s"
         )
-        await self.bot.send_notification(message)
+        self.bot.send_notification(message)
 
     async def start(self):
         """Start the whale watcher."""
@@ -52,6 +76,9 @@ class WhaleWatcher:
         self.running = True
         self._started_at = time.time()
         
+        # Open the pooled PolyMarket API session
+        await self.api.__aenter__()
+        
         # Start the Telegram bot
         await self.bot.start()
         logger.info("Telegram bot started")
@@ -62,7 +89,7 @@ class WhaleWatcher:
             f"Poll interval: {config.poll_interval}s\n"
             f"Min trade value: ${config.min_trade_value}"
         )
-        await self.bot.send_notification(start_message)
+        self.bot.send_notification(start_message)
         self._last_heartbeat_sent = time.time()
         
         # Start polling for trades
@@ -88,9 +115,12 @@ class WhaleWatcher:
             f"Total runtime: {uptime/60:.1f} Minuten\n"
             f"Poll interval: {config.poll_interval}s"
         )
-        await self.bot.send_notification(stop_message)
+        self.bot.send_notification(stop_message)
         await self.bot.stop()
         await self.api.__aexit__(None, None, None)
+        # Compact the trade log now, while the log listener still runs;
+        # the store's atexit hook would only fire after the listener stopped
+        trade_store.close()
         logger.info("Stopped")
 
     async def _maybe_send_heartbeat(self, new_trades_count: int, fetched_trades: int):
@@ -103,16 +133,15 @@ class WhaleWatcher:
         await self._send_heartbeat(new_trades_count, fetched_trades)
         self._last_heartbeat_sent = current_time
 
-    @staticmethod
-    def _extract_trade_id(trade: Dict[str, Any]) -> Optional[str]:
-        """Extract a stable identifier from a trade payload."""
-        for key in ("transactionHash", "id", "name", "uuid"):
-            value = trade.get(key)
-            if value:
-                return str(value)
-        return None
-
-    def should_notify_trade(self, trade: Dict[str, Any]) -> bool:
+    def should_notify_trade(
+        self,
+        trade: Dict[str, Any],
+        min_value: float,
+        include_ids: FrozenSet[str],
+        include_matcher: Optional[Callable[[str], bool]],
+        exclude_ids: FrozenSet[str],
+        exclude_matcher: Optional[Callable[[str], bool]]
+    ) -> bool:
         """Check if a trade should trigger a notification.
         
         Filtering priority order:
@@ -122,16 +151,22 @@ class WhaleWatcher:
         4. Include market IDs (if any configured)
         5. Include text filters (if any configured)
         
+        The filter settings are passed in by the caller, which snapshots them
+        from ``config`` once per poll cycle.
+        
         Args:
-            trade: Trade dictionary from the API
+            trade: Annotated trade dictionary from ``iter_whale_trades``
+            min_value: Minimum trade value (``config.min_trade_value``)
+            include_ids: Lowercased market IDs to include (``config.market_ids_set``)
+            include_matcher: Include text matcher (``config.market_text_matcher``)
+            exclude_ids: Lowercased market IDs to exclude (``config.exclude_market_ids_set``)
+            exclude_matcher: Exclude text matcher (``config.exclude_market_text_matcher``)
             
         Returns:
             True if the trade should trigger a notification
         """
-        # 1. Check trade value (minimum threshold)
-        value = PolyMarketAPI.calculate_trade_value(trade)
-        
-        if value < config.min_trade_value:
+        # 1. Check trade value (minimum threshold, precomputed at fetch time)
+        if trade["_value"] < min_value:
             return False
         
         market_info = trade.get("market") if isinstance(trade.get("market"), dict) else {}
@@ -148,9 +183,8 @@ class WhaleWatcher:
         identifier_candidates = [str(candidate).lower() for candidate in identifier_candidates if candidate]
         
         # 2. Check exclude market IDs (priority: reject if matched)
-        if config.exclude_market_ids:
-            normalized_exclude_ids = {mid.lower() for mid in config.exclude_market_ids}
-            if any(candidate in normalized_exclude_ids for candidate in identifier_candidates):
+        if exclude_ids:
+            if any(candidate in exclude_ids for candidate in identifier_candidates):
                 return False
         
         # Get market text for text filter checks
@@ -165,20 +199,17 @@ class WhaleWatcher:
         ])).lower()
         
         # 3. Check exclude text filters (priority: reject if matched)
-        if config.exclude_market_text_filters:
-            if any(text_filter in market_text for text_filter in config.exclude_market_text_filters):
-                return False
+        if exclude_matcher is not None and exclude_matcher(market_text):
+            return False
         
         # 4. Check include market IDs (if configured, must match)
-        if config.market_ids:
-            normalized_include_ids = {mid.lower() for mid in config.market_ids}
-            if not any(candidate in normalized_include_ids for candidate in identifier_candidates):
+        if include_ids:
+            if not any(candidate in include_ids for candidate in identifier_candidates):
                 return False
         
         # 5. Check include text filters (if configured, must match)
-        if config.market_text_filters:
-            if not any(text_filter in market_text for text_filter in config.market_text_filters):
-                return False
+        if include_matcher is not None and not include_matcher(market_text):
+            return False
         
         return True
     
@@ -195,44 +226,68 @@ class WhaleWatcher:
                     continue
                 
                 logger.debug(f"Fetching trades for {len(config.whale_addresses)} whale addresses...")
-                trades = await self.api.get_all_whale_trades(config.whale_addresses)
                 
-                logger.debug(f"Fetched {len(trades)} trades")
+                # Process each whale's trades as soon as its fetch completes,
+                # persisting everything seen this cycle at once
+                now = time.time()
+                fetched_trades = 0
+                seen_in_cycle: List[str] = []
+                notified_in_cycle: List[str] = []
+                cycle_ids: Set[str] = set()
+                # Snapshot filter settings into locals for the trade loop
+                min_value = config.min_trade_value
+                include_ids = config.market_ids_set
+                include_matcher = config.market_text_matcher
+                exclude_ids = config.exclude_market_ids_set
+                exclude_matcher = config.exclude_market_text_matcher
+                try:
+                    # Already-seen trades are dropped per whale right after the fetch
+                    for next_whale_trades in self.api.iter_whale_trades(
+                        list(config.whale_addresses),
+                        is_new=trade_store.is_new_trade
+                    ):
+                        try:
+                            fetched, whale_trades = await next_whale_trades
+                        except Exception as e:
+                            # One failing whale must not abort the rest of the cycle
+                            logger.error(f"Error fetching trades for whale: {e}", exc_info=True)
+                            continue
+                        fetched_trades += fetched
+                        for trade in whale_trades:
+                            trade_id = PolyMarketAPI.extract_trade_id(trade)
+                            if not trade_id or trade_id in cycle_ids:
+                                continue
+                            
+                            # Check if trade is new
+                            if not trade_store.is_new_trade(trade_id):
+                                continue
+                            cycle_ids.add(trade_id)
+                            
+                            # Check if trade should trigger notification
+                            if not self.should_notify_trade(
+                                trade,
+                                min_value,
+                                include_ids,
+                                include_matcher,
+                                exclude_ids,
+                                exclude_matcher
+                            ):
+                                seen_in_cycle.append(trade_id)
+                                continue
+                            
+                            # Hand off to the bot's outbox
+                            self.bot.send_notification(PolyMarketAPI.format_trade(trade))
+                            notified_in_cycle.append(trade_id)
+                finally:
+                    await trade_store.mark_trades_seen_async(seen_in_cycle + notified_in_cycle, now)
+                new_trades_count = len(notified_in_cycle)
                 
-                # Process trades
-                new_trades_count = 0
-                for trade in trades:
-                    trade_id = self._extract_trade_id(trade)
-                    if not trade_id:
-                        continue
-                    
-                    # Check if trade is new
-                    if not trade_store.is_new_trade(trade_id):
-                        continue
-                    
-                    # Check if trade should trigger notification
-                    if not self.should_notify_trade(trade):
-                        trade_store.mark_trade_seen(trade_id)
-                        continue
-                    
-                    # Send notification
-                    message = PolyMarketAPI.format_trade(trade)
-                    await self.bot.send_notification(message)
-                    
-                    # Mark as seen
-                    trade_store.mark_trade_seen(trade_id)
-                    new_trades_count += 1
-                    
-                    # Small delay between notifications
-                    await asyncio.sleep(1)
+                logger.debug(f"Fetched {fetched_trades} trades")
                 
                 if new_trades_count > 0:
-                    logger.info(f"Sent {new_trades_count} notifications")
-                
+                    logger.info(f"Queued {new_trades_count} notifications")
                 
-                
-
-                await self._maybe_send_heartbeat(new_trades_count, len(trades))
+                await self._maybe_send_heartbeat(new_trades_count, fetched_trades)
                 
             except Exception as e:
                 logger.error(f"Error in polling loop: {e}", exc_info=True)
@@ -3,12 +3,62 @@
 import aiohttp
 import asyncio
 import logging
-from typing import List, Dict, Any, Optional
-from datetime import datetime
+import time
+from typing import Awaitable, Callable, Iterator, List, Dict, Any, Optional, Tuple
+from . import jsonutil
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Fields read by format_trade, in unpacking order, with the defaults used
+# when a key is missing
+_FORMAT_DEFAULTS: Dict[str, Any] = {
+    "maker_address": None,
+    "user": None,
+    "title": None,
+    "market": None,
+    "outcome": "N/A",
+    "_side": "",
+    "price": 0,
+    "size": 0,
+    "_value": 0.0,
+    "eventSlug": None,
+    "slug": None,
+    "timestamp": None,
+    "created_at": 0,
+}
+
+
+def _annotate_trade(trade: Dict[str, Any]) -> None:
+    """Cache derived fields on a trade so later stages don't recompute them.
+    
+    Sets ``_side`` (uppercased side), ``_value`` (USD value, see
+    ``PolyMarketAPI.calculate_trade_value``) and ``_fmt`` (the fields read
+    by ``format_trade``, with ``_FORMAT_DEFAULTS`` for missing keys). API
+    keys are left untouched, since the filters read them too.
+    """
+    side = str(trade.get("side") or "").upper()
+    price = float(trade.get("price", 0) or 0)
+    size = float(trade.get("size", 0) or 0)
+    trade["_side"] = side
+    trade["_value"] = size if side == "SELL" else size * price
+    trade["_fmt"] = [trade.get(key, default) for key, default in _FORMAT_DEFAULTS.items()]
+
+
+_TRADE_ALERT_FMT = (
+    "🐋 Whale Trade Alert\n"
+    "━━━━━━━━━━━━━━━━━\n"
+    "👤 Trader: %s\n"
+    "📊 Market: %s\n"
+    "🏷️ Outcome: %s\n"
+    "⚖️ Side: %s%s\n"
+    "📈 Size: %s\n"
+    "💵 Price: $%.4f\n"
+    "💰 Value: $%.2f\n"
+    "🕒 Time: %s\n"
+    "🆔 ID: %s...\n"
+)
+
 
 class PolyMarketAPI:
     """Client for interacting with the PolyMarket API."""
@@ -16,7 +66,7 @@ class PolyMarketAPI:
     BASE_URL = "https://data-api.polymarket.com"
     TRADES_ENDPOINT = "/trades"
     
-    def __init__(self, session: Optional[aiohttp.ClientSession] = None):
+    def __init__(self, session: Optional[aiohttp.ClientSession] = None) -> None:
         """Initialize the PolyMarket API client.
         
         Args:
@@ -25,6 +75,22 @@ class PolyMarketAPI:
         self.session = session
         self._own_session = session is None
     
+    @staticmethod
+    def extract_trade_id(trade: Dict[str, Any]) -> Optional[str]:
+        """Extract a stable identifier from a trade payload.
+        
+        Args:
+            trade: Trade dictionary from the API
+            
+        Returns:
+            Trade identifier, or None if the trade carries none
+        """
+        for key in ("transactionHash", "id", "name", "uuid"):
+            value = trade.get(key)
+            if value:
+                return str(value)
+        return None
+    
     @staticmethod
     def calculate_trade_value(trade: Dict[str, Any]) -> float:
         """Calculate the trade value.
@@ -42,16 +108,30 @@ class PolyMarketAPI:
         # Calculate trade value (size * price for buy, size for sell)
         return size if side == "SELL" else size * price
     
-    async def __aenter__(self):
-        """Async context manager entry."""
+    async def __aenter__(self) -> "PolyMarketAPI":
+        """Async context manager entry.
+        
+        Creates a pooled session that keeps connections to the API alive
+        between polls so concurrent whale fetches reuse TCP/TLS state.
+        """
         if self._own_session:
-            self.session = aiohttp.ClientSession()
+            connector = aiohttp.TCPConnector(
+                limit=100,
+                limit_per_host=50,
+                keepalive_timeout=60,
+                ttl_dns_cache=300
+            )
+            self.session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=30)
+            )
         return self
     
-    async def __aexit__(self, exc_type, exc_val, exc_tb):
+    async def __aexit__(self, exc_type: Any, exc_val: Any, exc_tb: Any) -> None:
         """Async context manager exit."""
         if self._own_session and self.session:
             await self.session.close()
+            self.session = None
     
     async def get_trades(
         self,
@@ -63,38 +143,40 @@ class PolyMarketAPI:
         """Fetch recent trades from PolyMarket.
         
         Args:
-            maker_address: Optional address to filter trades by maker
+            maker_address: Optional lowercase address to filter trades by maker
+                (``Config`` stores whale addresses already lowercased)
             limit: Maximum number of trades to fetch
             retries: Number of retry attempts on failure
             retry_delay: Delay between retries in seconds
             
         Returns:
             List of trade dictionaries
+            
+        Raises:
+            RuntimeError: If the client session has not been started
         """
+        if not self.session:
+            raise RuntimeError("PolyMarketAPI session not started; use 'async with' or __aenter__()")
+        
         params: Dict[str, Any] = {"limit": limit, "offset": 0}
         if maker_address:
-            params["user"] = maker_address.lower()
+            params["user"] = maker_address
         
         for attempt in range(retries):
             try:
-                if not self.session:
-                    self.session = aiohttp.ClientSession()
-                    self._own_session = True
-                
                 url = f"{self.BASE_URL}{self.TRADES_ENDPOINT}"
-                async with self.session.get(url, params=params, timeout=30) as response:
+                async with self.session.get(url, params=params) as response:
                     if response.status == 200:
-                        data = await response.json()
+                        data = jsonutil.loads(await response.read())
                         trades = data if isinstance(data, list) else []
                         if maker_address:
                             for trade in trades:
-                                trade.setdefault("maker_address", maker_address.lower())
+                                trade["maker_address"] = maker_address
                         return trades
                     else:
                         logger.warning(f"API returned status {response.status}")
                         if attempt < retries - 1:
                             await asyncio.sleep(retry_delay)
-                        continue
             except asyncio.TimeoutError:
                 logger.warning(f"Timeout fetching trades (attempt {attempt + 1}/{retries})")
                 if attempt < retries - 1:
@@ -106,41 +188,58 @@ class PolyMarketAPI:
         
         return []
     
-    async def get_all_whale_trades(
+    async def _fetch_new_trades(
+        self,
+        address: str,
+        limit: int,
+        is_new: Optional[Callable[[str], bool]]
+    ) -> Tuple[int, List[Dict[str, Any]]]:
+        """Fetch one whale's trades, drop known ones and annotate the rest.
+        
+        Returns:
+            Number of trades the API returned, and the remaining new trades
+        """
+        trades = await self.get_trades(maker_address=address, limit=limit)
+        fetched = len(trades)
+        if is_new is not None:
+            trades = [
+                trade for trade in trades
+                if (trade_id := self.extract_trade_id(trade)) and is_new(trade_id)
+            ]
+        # Compute side/value once per trade
+        for trade in trades:
+            _annotate_trade(trade)
+        return fetched, trades
+    
+    def iter_whale_trades(
         self,
         whale_addresses: List[str],
-        limit_per_address: int = 50
-    ) -> List[Dict[str, Any]]:
-        """Fetch trades for multiple whale addresses.
+        limit_per_address: int = 50,
+        is_new: Optional[Callable[[str], bool]] = None
+    ) -> Iterator[Awaitable[Tuple[int, List[Dict[str, Any]]]]]:
+        """Fetch trades for multiple whales, in order of completion.
+        
+        Must be called from a running event loop. Each returned awaitable
+        resolves to one whale's trades as soon as that fetch finishes, so
+        callers can process fast whales without waiting for slow ones.
         
         Args:
-            whale_addresses: List of addresses to fetch trades for
+            whale_addresses: List of lowercase addresses to fetch trades for
             limit_per_address: Maximum trades per address
+            is_new: Optional predicate on trade IDs; when given, trades that
+                are already known (or carry no ID) are dropped
             
         Returns:
-            Combined list of all trades
+            Iterator of awaitables, each resolving to a ``(fetched, trades)``
+            pair: the number of trades the API returned for one whale, and
+            its new trades (most recent first), annotated with ``_side`` and
+            ``_value``
         """
         tasks = [
-            self.get_trades(maker_address=addr, limit=limit_per_address)
+            self._fetch_new_trades(addr, limit_per_address, is_new)
             for addr in whale_addresses
         ]
-        
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-        
-        all_trades = []
-        for result in results:
-            if isinstance(result, list):
-                all_trades.extend(result)
-            elif isinstance(result, Exception):
-                logger.error(f"Error fetching trades for whale: {result}")
-        
-        # Sort by timestamp (most recent first)
-        all_trades.sort(
-            key=lambda x: x.get("timestamp", x.get("created_at", 0)),
-            reverse=True
-        )
-        
-        return all_trades
+        return asyncio.as_completed(tasks)
     
     @staticmethod
     def format_trade(trade: Dict[str, Any]) -> str:
@@ -152,46 +251,54 @@ class PolyMarketAPI:
         Returns:
             Formatted string representation of the trade
         """
-        trade_id = (
-            trade.get("transactionHash")
-            or trade.get("id")
-            or trade.get("name")
-            or trade.get("uuid")
-            or "unknown"
-        )
-        maker = trade.get("maker_address") or trade.get("user") or "unknown"
-        maker_display = maker[:10] + "..." if maker not in (None, "unknown") else maker
-        market_info = trade.get("market") if isinstance(trade.get("market"), dict) else {}
-        title = trade.get("title") or market_info.get("question") or "Unknown Market"
-        outcome = trade.get("outcome", "N/A")
-        side = trade.get("side", "unknown").upper()
-        price = float(trade.get("price", 0))
-        size = float(trade.get("size", 0))
-        value = PolyMarketAPI.calculate_trade_value(trade)
-        event_slug = trade.get("eventSlug") or trade.get("slug")
-        timestamp = trade.get("timestamp", trade.get("created_at", 0))
+        if "_fmt" not in trade:
+            _annotate_trade(trade)
+        trade_id = PolyMarketAPI.extract_trade_id(trade) or "unknown"
+        (
+            maker_address,
+            user,
+            title,
+            market,
+            outcome,
+            side,
+            price,
+            size,
+            value,
+            event_slug,
+            slug,
+            timestamp,
+            created_at,
+        ) = trade["_fmt"]
+        maker = maker_address or user or "unknown"
+        maker_display = maker[:10] + "..." if maker != "unknown" else maker
+        if not title:
+            title = (market.get("question") if isinstance(market, dict) else None) or "Unknown Market"
+        side = side or "UNKNOWN"
+        price = float(price)
+        size = float(size)
+        event_slug = event_slug or slug
+        if timestamp is None:
+            timestamp = created_at
         if timestamp:
             try:
-                dt = datetime.fromtimestamp(int(timestamp))
-                time_str = dt.strftime("%Y-%m-%d %H:%M:%S")
+                time_str = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(int(timestamp)))
             except Exception:
                 time_str = str(timestamp)
         else:
             time_str = "unknown"
         link = f"https://polymarket.com/event/{event_slug}" if event_slug else None
         side_emoji = "🟢" if side == "BUY" else "🔴"
-        message = (
-            "🐋 Whale Trade Alert\n"
-            "━━━━━━━━━━━━━━━━━\n"
-            f"👤 Trader: {maker_display}\n"
-            f"📊 Market: {title}\n"
-            f"🏷️ Outcome: {outcome}\n"
-            f"⚖️ Side: {side_emoji+side}\n"
-            f"📈 Size: {size}\n"
-            f"💵 Price: ${price:.4f}\n"
-            f"💰 Value: ${value:.2f}\n"
-            f"🕒 Time: {time_str}\n"
-            f"🆔 ID: {trade_id[:10]}...\n"
+        message = _TRADE_ALERT_FMT % (
+            maker_display,
+            title,
+            outcome,
+            side_emoji,
+            side,
+            size,
+            price,
+            value,
+            time_str,
+            trade_id[:10],
         )
         if link:
             message += f"\n🔗 Link: {link}"
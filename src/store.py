@@ -1,66 +1,151 @@
 """Trade storage and deduplication for the PolyMarket Whale Watcher bot."""
 
-import json
+import asyncio
+import atexit
 import logging
 import os
-from typing import Set, Dict, Any
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Iterable, List, Optional
 from datetime import datetime, timedelta
 
+from . import jsonutil
+
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Number of appended log entries after which the snapshot is rewritten
+COMPACT_THRESHOLD = 1000
+
+# Maximum number of trade IDs remembered; the oldest are evicted first
+MAX_SEEN = 100_000
+
+# Pre-serialized snapshot of an empty store
+_EMPTY_SNAPSHOT = b'{"trades":[]}'
+
 
 class TradeStore:
-    """Store for tracking seen trades and preventing duplicates."""
+    """Store for tracking seen trades and preventing duplicates.
+    
+    Seen trades are persisted as a JSON snapshot plus an append-only JSONL
+    log next to it. Each new trade appends a single line to the log; the
+    snapshot is only rewritten on compaction (every ``COMPACT_THRESHOLD``
+    entries, on ``clear()`` and at shutdown).
     
-    def __init__(self, filepath: str = "trades.json"):
+    ``seen_trades`` maps trade IDs to the time they were seen and acts as a
+    ring buffer holding at most ``MAX_SEEN`` entries.
+    """
+    
+    def __init__(self, filepath: str = "trades.json") -> None:
         """Initialize the trade store.
         
         Args:
             filepath: Path to the JSON file for persisting trade IDs
         """
         self.filepath = filepath
-        self.seen_trades: Set[str] = set()
-        self.trade_timestamps: Dict[str, float] = {}
+        self.log_filepath = filepath + ".log"
+        self.seen_trades: "OrderedDict[str, float]" = OrderedDict()
+        self._dirty = 0
         self._load()
+        self._log = open(self.log_filepath, "ab")
+        atexit.register(self.close)
     
-    def _load(self):
-        """Load seen trades from disk."""
+    def _load(self) -> None:
+        """Load seen trades from the snapshot and replay the append log."""
         if os.path.exists(self.filepath):
             try:
-                with open(self.filepath, 'r') as f:
-                    data = json.load(f)
-                    self.seen_trades = set(data.get("trades", []))
-                    self.trade_timestamps = data.get("timestamps", {})
-                    # Clean old entries (older than 7 days)
-                    self._clean_old_entries()
+                data = jsonutil.load_file(self.filepath)
+                trades = data.get("trades", [])
+                if trades and isinstance(trades[0], str):
+                    # Legacy snapshot: ID list plus a separate timestamp map
+                    timestamps = data.get("timestamps", {})
+                    trades = sorted(
+                        ((trade_id, timestamps.get(trade_id, 0)) for trade_id in trades),
+                        key=lambda entry: entry[1]
+                    )
+                for trade_id, ts in trades:
+                    self._remember(trade_id, ts)
             except Exception as e:
                 logger.error(f"Error loading trade store from {self.filepath}: {e}", exc_info=True)
-                self.seen_trades = set()
-                self.trade_timestamps = {}
+                self.seen_trades = OrderedDict()
+        self._replay_log()
+        # Clean old entries (older than 7 days)
+        self._clean_old_entries()
+    
+    def _replay_log(self) -> None:
+        """Apply entries from the append log on top of the loaded snapshot."""
+        if not os.path.exists(self.log_filepath):
+            return
+        try:
+            with open(self.log_filepath, 'rb') as f:
+                data = f.read()
+            # One bulk parse; torn lines from an unclean shutdown are skipped
+            entries = jsonutil.loads_lines(data)
+            if data and not data.endswith(b"\n"):
+                # Cut a torn tail so the next append starts on a fresh line
+                os.truncate(self.log_filepath, data.rfind(b"\n") + 1)
+            for entry in entries:
+                trade_id = entry.get("i") if isinstance(entry, dict) else None
+                if trade_id:
+                    self._remember(trade_id, entry.get("t", 0))
+                    self._dirty += 1
+        except Exception as e:
+            logger.error(f"Error replaying trade log {self.log_filepath}: {e}", exc_info=True)
+    
+    def _write_log(self, lines: List[bytes]) -> None:
+        """Write serialized log entries to the log file."""
+        self._log.write(b"".join(lines))
+        self._log.flush()
     
-    def _save(self):
-        """Save seen trades to disk."""
+    def _append(self, lines: List[bytes]) -> None:
+        """Append serialized log entries to the log with a single write."""
         try:
-            data = {
-                "trades": list(self.seen_trades),
-                "timestamps": self.trade_timestamps
-            }
-            with open(self.filepath, 'w') as f:
-                json.dump(data, f, indent=2)
+            self._write_log(lines)
+        except Exception as e:
+            logger.error(f"Error appending to trade log {self.log_filepath}: {e}", exc_info=True)
+            return
+        self._dirty += len(lines)
+        if self._dirty >= COMPACT_THRESHOLD:
+            self._compact()
+    
+    def _snapshot_data(self) -> Dict[str, Any]:
+        """Copy the in-memory state into a serializable snapshot."""
+        return {"trades": list(self.seen_trades.items())}
+    
+    def _write_snapshot(self, data: Dict[str, Any]) -> None:
+        """Atomically replace the snapshot file and truncate the log."""
+        tmp_path = self.filepath + ".tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(jsonutil.dumps(data, indent=True))
+        os.replace(tmp_path, self.filepath)
+        self._log.seek(0)
+        self._log.truncate()
+    
+    def _compact(self) -> None:
+        """Write a fresh snapshot of seen trades and truncate the log."""
+        try:
+            self._write_snapshot(self._snapshot_data())
+            self._dirty = 0
         except Exception as e:
             logger.error(f"Error saving trade store to {self.filepath}: {e}", exc_info=True)
     
-    def _clean_old_entries(self):
+    def _clean_old_entries(self) -> None:
         """Remove entries older than 7 days."""
         cutoff = (datetime.now() - timedelta(days=7)).timestamp()
         old_trades = [
-            trade_id for trade_id, ts in self.trade_timestamps.items()
+            trade_id for trade_id, ts in self.seen_trades.items()
             if ts < cutoff
         ]
         for trade_id in old_trades:
-            self.seen_trades.discard(trade_id)
-            self.trade_timestamps.pop(trade_id, None)
+            del self.seen_trades[trade_id]
+    
+    def _remember(self, trade_id: str, ts: float) -> None:
+        """Record a trade in the ring buffer, evicting the oldest if full."""
+        seen_trades = self.seen_trades
+        seen_trades[trade_id] = ts
+        seen_trades.move_to_end(trade_id)
+        if len(seen_trades) > MAX_SEEN:
+            seen_trades.popitem(last=False)
     
     def is_new_trade(self, trade_id: str) -> bool:
         """Check if a trade is new (not seen before).
@@ -73,21 +158,94 @@ class TradeStore:
         """
         return trade_id not in self.seen_trades
     
-    def mark_trade_seen(self, trade_id: str):
+    def mark_trade_seen(self, trade_id: str, ts: Optional[float] = None) -> None:
         """Mark a trade as seen.
         
         Args:
             trade_id: Unique identifier for the trade
+            ts: Time the trade was seen (defaults to now)
+        """
+        self.mark_trades_seen((trade_id,), ts)
+    
+    def _record(self, trade_ids: Iterable[str], ts: Optional[float]) -> List[bytes]:
+        """Add trades to the in-memory state and return their log entries."""
+        if ts is None:
+            ts = time.time()
+        lines = []
+        for trade_id in trade_ids:
+            self._remember(trade_id, ts)
+            lines.append(jsonutil.dumps_line({"i": trade_id, "t": ts}))
+        return lines
+    
+    def mark_trades_seen(self, trade_ids: Iterable[str], ts: Optional[float] = None) -> None:
+        """Mark several trades as seen, persisting them in one log write.
+        
+        Args:
+            trade_ids: Unique identifiers for the trades
+            ts: Time the trades were seen (defaults to now)
+        """
+        lines = self._record(trade_ids, ts)
+        if lines:
+            self._append(lines)
+    
+    async def mark_trade_seen_async(self, trade_id: str, ts: Optional[float] = None) -> None:
+        """Mark a trade as seen without blocking the event loop on disk I/O.
+        
+        Args:
+            trade_id: Unique identifier for the trade
+            ts: Time the trade was seen (defaults to now)
         """
-        self.seen_trades.add(trade_id)
-        self.trade_timestamps[trade_id] = datetime.now().timestamp()
-        self._save()
+        await self.mark_trades_seen_async((trade_id,), ts)
     
-    def clear(self):
+    async def mark_trades_seen_async(self, trade_ids: Iterable[str], ts: Optional[float] = None) -> None:
+        """Mark several trades as seen, writing to disk in the default executor.
+        
+        The in-memory state is updated immediately; the log write and any
+        resulting compaction run in a worker thread.
+        
+        Args:
+            trade_ids: Unique identifiers for the trades
+            ts: Time the trades were seen (defaults to now)
+        """
+        lines = self._record(trade_ids, ts)
+        if not lines:
+            return
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(None, self._write_log, lines)
+        except Exception as e:
+            logger.error(f"Error appending to trade log {self.log_filepath}: {e}", exc_info=True)
+            return
+        self._dirty += len(lines)
+        if self._dirty >= COMPACT_THRESHOLD:
+            # Copy the state on the loop thread; only serialization and I/O run off-loop
+            data = self._snapshot_data()
+            try:
+                await loop.run_in_executor(None, self._write_snapshot, data)
+                self._dirty = 0
+            except Exception as e:
+                logger.error(f"Error saving trade store to {self.filepath}: {e}", exc_info=True)
+    
+    def clear(self) -> None:
         """Clear all stored trades."""
         self.seen_trades.clear()
-        self.trade_timestamps.clear()
-        self._save()
+        try:
+            # The log handle stays open, so truncate it instead of removing the file
+            self._log.seek(0)
+            self._log.truncate()
+            with open(self.filepath, 'wb') as f:
+                f.write(_EMPTY_SNAPSHOT)
+            self._dirty = 0
+        except Exception as e:
+            logger.error(f"Error clearing trade store {self.filepath}: {e}", exc_info=True)
+    
+    def close(self) -> None:
+        """Compact pending log entries and close the log file."""
+        if self._log.closed:
+            return
+        if self._dirty:
+            self._compact()
+        self._log.close()
     
     def get_stats(self) -> Dict[str, Any]:
         """Get statistics about stored trades.
@@ -97,8 +255,8 @@ class TradeStore:
         """
         return {
             "total_trades": len(self.seen_trades),
-            "oldest_trade": min(self.trade_timestamps.values()) if self.trade_timestamps else None,
-            "newest_trade": max(self.trade_timestamps.values()) if self.trade_timestamps else None
+            "oldest_trade": min(self.seen_trades.values()) if self.seen_trades else None,
+            "newest_trade": max(self.seen_trades.values()) if self.seen_trades else None
         }
 
 
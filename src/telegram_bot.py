@@ -1,27 +1,157 @@
 """Telegram bot for managing the PolyMarket Whale Watcher."""
 
 import logging
-from telegram import Update
+from telegram import Message, Update
+from telegram.constants import MessageLimit
+from telegram.request import HTTPXRequest
 from telegram.ext import (
     Application,
-    CommandHandler,
     ContextTypes,
+    MessageHandler,
     filters,
 )
-from typing import Optional
+from typing import Any, Awaitable, Callable, Collection, Dict, List, Optional, Pattern, Type, Union
 import asyncio
 import contextlib
+import re
+
+import httpx
 
 from .config import config
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Telegram allows roughly one message per second into a single chat
+OUTBOX_INTERVAL = 1.0
+# Maximum time to spend delivering queued notifications on shutdown
+OUTBOX_DRAIN_TIMEOUT = 10.0
+# Seconds between keepalive requests; pooled connections outlive this
+KEEPALIVE_INTERVAL = 240
+_KEEPALIVE_EXPIRY = 300.0
+# Placed between notifications that are batched into one message
+_BATCH_SEPARATOR = "\n\n—\n\n"
+# Numeric argument shapes, checked before conversion so bad input never raises
+_FLOAT_RE = re.compile(r"-?\d+(?:\.\d+)?$")
+_INT_RE = re.compile(r"-?\d+$")
+_NUMBER_RES: Dict[type, Pattern[str]] = {float: _FLOAT_RE, int: _INT_RE}
+# Upper bound for each step of stop(), in seconds
+STOP_STEP_TIMEOUT = 5.0
+
+_HELP_TEXT = (
+    "🐋 PolyMarket Whale Watcher Bot\n\n"
+    "Available commands:\n"
+    "/help - Show this help message\n"
+    "/status - Show current configuration\n"
+    "/addwhale <address> - Add whale address\n"
+    "/removewhale <address> - Remove whale address\n"
+    "/listwhales - List tracked whale addresses\n"
+    "/addmarket <id> - Add market ID filter\n"
+    "/removemarket <id> - Remove market ID filter\n"
+    "/listmarkets - List market filters\n"
+    "/addtext <keyword> - Add text filter\n"
+    "/removetext <keyword> - Remove text filter\n"
+    "/listtexts - List text filters\n"
+    "/addmex <id> - Exclude market ID\n"
+    "/removemex <id> - Remove market ID exclusion\n"
+    "/listmex - List excluded market IDs\n"
+    "/addtex <keyword> - Exclude text filter\n"
+    "/removetex <keyword> - Remove text exclusion\n"
+    "/listtex - List excluded text filters\n"
+    "/setminvalue <value> - Set minimum trade value\n"
+    "/setinterval <seconds> - Set poll interval\n"
+    "/setheartbeat <seconds> - Set heartbeat interval\n"
+)
+
+# Reply sent to commands from any chat other than the allowed one
+_UNAUTH = "⛔ Unauthorized access."
+
+# Every command handled by the bot; each maps to a <name>_command method
+_COMMANDS = (
+    "start",
+    "help",
+    "status",
+    "addwhale",
+    "removewhale",
+    "listwhales",
+    "addmarket",
+    "removemarket",
+    "listmarkets",
+    "addtext",
+    "removetext",
+    "listtexts",
+    "setminvalue",
+    "setinterval",
+    "setheartbeat",
+    "addmex",
+    "removemex",
+    "listmex",
+    "addtex",
+    "removetex",
+    "listtex",
+)
+
+# Commands that only read config; these never wait on dispatch
+_READ_ONLY_COMMANDS = frozenset({
+    "start",
+    "help",
+    "status",
+    "listwhales",
+    "listmarkets",
+    "listtexts",
+    "listmex",
+    "listtex",
+})
+
+
+def _utf16_len(text: str) -> int:
+    """Return the length of a text in UTF-16 code units, as Telegram counts it."""
+    return len(text.encode("utf-16-le")) // 2
+
+
+_SEPARATOR_LEN = _utf16_len(_BATCH_SEPARATOR)
+
+
+def _command_name(word: str, bot_username: Optional[str]) -> Optional[str]:
+    """Return the lowercased name of a ``/command[@bot]`` word.
+    
+    Args:
+        word: First word of the command message
+        bot_username: Username of this bot
+        
+    Returns:
+        The command name, or None if the command is addressed to another bot
+    """
+    name, _, target = word.lstrip("/").partition("@")
+    if target and target.lower() != (bot_username or "").lower():
+        return None
+    return name.lower()
+
+
+async def _bounded(awaitable: Awaitable[Any], step: str) -> None:
+    """Await one shutdown step, giving up after STOP_STEP_TIMEOUT seconds.
+    
+    Args:
+        awaitable: Shutdown step to run
+        step: Description used in the timeout warning
+    """
+    try:
+        await asyncio.wait_for(awaitable, timeout=STOP_STEP_TIMEOUT)
+    except asyncio.TimeoutError:
+        logger.warning(f"Timed out after {STOP_STEP_TIMEOUT}s waiting for {step}")
+
+
+async def _cancel_task(task: asyncio.Task, step: str) -> None:
+    """Cancel a background task and wait a bounded time for it to finish."""
+    task.cancel()
+    with contextlib.suppress(asyncio.CancelledError):
+        await _bounded(task, step)
+
 
 class TelegramBot:
     """Telegram bot for whale watcher notifications and commands."""
     
-    def __init__(self, token: str, allowed_chat_id: str):
+    def __init__(self, token: str, allowed_chat_id: Union[int, str]):
         """Initialize the Telegram bot.
         
         Args:
@@ -29,10 +159,23 @@ class TelegramBot:
             allowed_chat_id: Chat ID that is allowed to use the bot
         """
         self.token = token
-        self.allowed_chat_id = allowed_chat_id
+        # Parsed once; the chat filter and the Bot API both take ints
+        self.allowed_chat_id = int(allowed_chat_id)
         self.application: Optional[Application] = None
         self._polling_task: Optional[asyncio.Task] = None
+        self._outbox: "asyncio.Queue[str]" = asyncio.Queue(maxsize=1000)
+        self._outbox_task: Optional[asyncio.Task] = None
+        self._keepalive_task: Optional[asyncio.Task] = None
         self.notification_callback = None
+        # Rendered list replies, keyed by config attribute; dropped when it changes
+        self._rendered: Dict[str, str] = {}
+        # Last /status reply; dropped on any config change
+        self._status_cache: Optional[str] = None
+        config.subscribe(self._on_config_change)
+        # Command name -> handler, looked up once per incoming command
+        self._cmds: Dict[str, Callable] = {
+            name: getattr(self, f"{name}_command") for name in _COMMANDS
+        }
     
     def set_notification_callback(self, callback):
         """Set the callback function for sending notifications.
@@ -42,412 +185,455 @@ class TelegramBot:
         """
         self.notification_callback = callback
     
-    def _check_authorization(self, update: Update) -> bool:
-        """Check if the user is authorized to use the bot."""
-        if update.effective_chat:
-            return str(update.effective_chat.id) == self.allowed_chat_id
-        return False
+    def _on_config_change(self, field: str):
+        """Drop cached replies that depend on the changed config attribute."""
+        self._rendered.pop(field, None)
+        self._status_cache = None
     
-    async def start_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
-        """Handle /start command."""
-        if not self._check_authorization(update):
-            await update.message.reply_text("⛔ Unauthorized access.")
-            return
+    def _render_list(self, key: str, header: str, items: Collection[str], empty_text: str) -> str:
+        """Return the numbered list reply for a config list, rendering it once.
         
-        help_text = (
-            "🐋 PolyMarket Whale Watcher Bot\n\n"
-            "Available commands:\n"
-            "/help - Show this help message\n"
-            "/status - Show current configuration\n"
-            "/addwhale <address> - Add whale address\n"
-            "/removewhale <address> - Remove whale address\n"
-            "/listwhales - List tracked whale addresses\n"
-            "/addmarket <id> - Add market ID filter\n"
-            "/removemarket <id> - Remove market ID filter\n"
-            "/listmarkets - List market filters\n"
-            "/addtext <keyword> - Add text filter\n"
-            "/removetext <keyword> - Remove text filter\n"
-            "/listtexts - List text filters\n"
-            "/addmex <id> - Exclude market ID\n"
-            "/removemex <id> - Remove market ID exclusion\n"
-            "/listmex - List excluded market IDs\n"
-            "/addtex <keyword> - Exclude text filter\n"
-            "/removetex <keyword> - Remove text exclusion\n"
-            "/listtex - List excluded text filters\n"
-            "/setminvalue <value> - Set minimum trade value\n"
-            "/setinterval <seconds> - Set poll interval\n"
-            "/setheartbeat <seconds> - Set heartbeat interval\n"
-        )
-        await update.message.reply_text(help_text)
+        Args:
+            key: Cache key for the list
+            header: Heading placed above the numbered items
+            items: Items to list
+            empty_text: Reply used when the list is empty
+        """
+        text = self._rendered.get(key)
+        if text is None:
+            if items:
+                text = header + "\n".join(["%d. %s" % (i, item) for i, item in enumerate(items, 1)])
+            else:
+                text = empty_text
+            self._rendered[key] = text
+        return text
     
-    async def help_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
-        """Handle /help command."""
-        await self.start_command(update, context)
+    async def _dispatch(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Route a command message to its handler via the command map.
+        
+        Handlers receive the effective message, so edited commands are
+        answered the same way as new ones. Read-only commands run as
+        separate tasks so the update is released without waiting on the
+        reply.
+        """
+        message = update.effective_message
+        if message is None or not message.text:
+            return
+        words = message.text.split()
+        name = _command_name(words[0], context.bot.username)
+        handler = self._cmds.get(name) if name else None
+        if handler:
+            context.args = words[1:]
+            if name in _READ_ONLY_COMMANDS:
+                context.application.create_task(handler(message, context), update=update)
+            else:
+                await handler(message, context)
     
-    async def status_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
-        """Handle /status command."""
-        if not self._check_authorization(update):
-            await update.message.reply_text("⛔ Unauthorized access.")
-            return
+    async def _reject(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Reply to this bot's commands sent from any chat other than the allowed one.
         
-        status_text = (
-            f"📊 Current Configuration\n\n"
-            f"Poll Interval: {config.poll_interval}s\n"
-            f"Heartbeat Interval: {config.heartbeat_interval}s\n"
-            f"Min Trade Value: ${config.min_trade_value}\n"
-            f"Tracked Whales: {len(config.whale_addresses)}\n"
-            f"Market Filters: {len(config.market_ids)}\n"
-            f"Text Filters: {len(config.market_text_filters)}\n"
-            f"Excluded Market IDs: {len(config.exclude_market_ids)}\n"
-            f"Excluded Text Filters: {len(config.exclude_market_text_filters)}\n"
-        )
-        await update.message.reply_text(status_text)
+        Unknown commands and commands addressed to other bots are ignored.
+        """
+        message = update.effective_message
+        if message is None or not message.text:
+            return
+        if _command_name(message.text.split()[0], context.bot.username) in self._cmds:
+            await message.reply_text(_UNAUTH)
+    
+    async def start_command(self, message: Message, context: ContextTypes.DEFAULT_TYPE):
+        """Handle /start and /help commands."""
+        await message.reply_text(_HELP_TEXT)
+    
+    # /help shows the same text as /start
+    help_command = start_command
     
-    async def addwhale_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+    async def status_command(self, message: Message, context: ContextTypes.DEFAULT_TYPE):
+        """Handle /status command."""
+        status_text = self._status_cache
+        if status_text is None:
+            status_text = (
+                f"📊 Current Configuration\n\n"
+                f"Poll Interval: {config.poll_interval}s\n"
+                f"Heartbeat Interval: {config.heartbeat_interval}s\n"
+                f"Min Trade Value: ${config.min_trade_value}\n"
+                f"Tracked Whales: {len(config.whale_addresses)}\n"
+                f"Market Filters: {len(config.market_ids)}\n"
+                f"Text Filters: {len(config.market_text_filters)}\n"
+                f"Excluded Market IDs: {len(config.exclude_market_ids)}\n"
+                f"Excluded Text Filters: {len(config.exclude_market_text_filters)}\n"
+            )
+            self._status_cache = status_text
+        await message.reply_text(status_text)
+    
+    async def addwhale_command(self, message: Message, context: ContextTypes.DEFAULT_TYPE):
         """Handle /addwhale command."""
-        if not self._check_authorization(update):
-            await update.message.reply_text("⛔ Unauthorized access.")
-            return
-        
         if not context.args:
-            await update.message.reply_text("Usage: /addwhale <address>")
+            await message.reply_text("Usage: /addwhale <address>")
             return
         
         address = context.args[0]
         if config.add_whale_address(address):
-            await update.message.reply_text(f"✅ Added whale address: {address}")
+            await message.reply_text(f"✅ Added whale address: {address}")
         else:
-            await update.message.reply_text(f"⚠️ Address already tracked or invalid: {address}")
+            await message.reply_text(f"⚠️ Address already tracked or invalid: {address}")
     
-    async def removewhale_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+    async def removewhale_command(self, message: Message, context: ContextTypes.DEFAULT_TYPE):
         """Handle /removewhale command."""
-        if not self._check_authorization(update):
-            await update.message.reply_text("⛔ Unauthorized access.")
-            return
-        
         if not context.args:
-            await update.message.reply_text("Usage: /removewhale <address>")
+            await message.reply_text("Usage: /removewhale <address>")
             return
         
         address = context.args[0]
         if config.remove_whale_address(address):
-            await update.message.reply_text(f"✅ Removed whale address: {address}")
+            await message.reply_text(f"✅ Removed whale address: {address}")
         else:
-            await update.message.reply_text(f"⚠️ Address not found: {address}")
+            await message.reply_text(f"⚠️ Address not found: {address}")
     
-    async def listwhales_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+    async def listwhales_command(self, message: Message, context: ContextTypes.DEFAULT_TYPE):
         """Handle /listwhales command."""
-        if not self._check_authorization(update):
-            await update.message.reply_text("⛔ Unauthorized access.")
-            return
-        
-        if config.whale_addresses:
-            whales_text = "🐋 Tracked Whale Addresses:\n\n" + "\n".join(
-                f"{i+1}. {addr}" for i, addr in enumerate(config.whale_addresses)
-            )
-        else:
-            whales_text = "No whale addresses tracked."
+        whales_text = self._render_list(
+            "whale_addresses",
+            "🐋 Tracked Whale Addresses:\n\n",
+            config.whale_addresses,
+            "No whale addresses tracked."
+        )
         
-        await update.message.reply_text(whales_text)
+        await message.reply_text(whales_text)
     
-    async def addmarket_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+    async def addmarket_command(self, message: Message, context: ContextTypes.DEFAULT_TYPE):
         """Handle /addmarket command."""
-        if not self._check_authorization(update):
-            await update.message.reply_text("⛔ Unauthorized access.")
-            return
-        
         if not context.args:
-            await update.message.reply_text("Usage: /addmarket <market_id>")
+            await message.reply_text("Usage: /addmarket <market_id>")
             return
         
         market_id = context.args[0]
         if config.add_market_filter(market_id):
-            await update.message.reply_text(f"✅ Added market filter: {market_id}")
+            await message.reply_text(f"✅ Added market filter: {market_id}")
         else:
-            await update.message.reply_text(f"⚠️ Market filter already exists: {market_id}")
+            await message.reply_text(f"⚠️ Market filter already exists: {market_id}")
     
-    async def removemarket_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+    async def removemarket_command(self, message: Message, context: ContextTypes.DEFAULT_TYPE):
         """Handle /removemarket command."""
-        if not self._check_authorization(update):
-            await update.message.reply_text("⛔ Unauthorized access.")
-            return
-        
         if not context.args:
-            await update.message.reply_text("Usage: /removemarket <market_id>")
+            await message.reply_text("Usage: /removemarket <market_id>")
             return
         
         market_id = context.args[0]
         if config.remove_market_filter(market_id):
-            await update.message.reply_text(f"✅ Removed market filter: {market_id}")
+            await message.reply_text(f"✅ Removed market filter: {market_id}")
         else:
-            await update.message.reply_text(f"⚠️ Market filter not found: {market_id}")
+            await message.reply_text(f"⚠️ Market filter not found: {market_id}")
     
-    async def listmarkets_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+    async def listmarkets_command(self, message: Message, context: ContextTypes.DEFAULT_TYPE):
         """Handle /listmarkets command."""
-        if not self._check_authorization(update):
-            await update.message.reply_text("⛔ Unauthorized access.")
-            return
-        
-        if config.market_ids:
-            markets_text = "📊 Market ID Filters:\n\n" + "\n".join(
-                f"{i+1}. {mid}" for i, mid in enumerate(config.market_ids)
-            )
-        else:
-            markets_text = "No market filters configured."
+        markets_text = self._render_list(
+            "market_ids",
+            "📊 Market ID Filters:\n\n",
+            config.market_ids,
+            "No market filters configured."
+        )
         
-        await update.message.reply_text(markets_text)
+        await message.reply_text(markets_text)
     
-    async def addtext_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+    async def addtext_command(self, message: Message, context: ContextTypes.DEFAULT_TYPE):
         """Handle /addtext command."""
-        if not self._check_authorization(update):
-            await update.message.reply_text("⛔ Unauthorized access.")
-            return
-        
         if not context.args:
-            await update.message.reply_text("Usage: /addtext <keyword>")
+            await message.reply_text("Usage: /addtext <keyword>")
             return
         
         text = " ".join(context.args)
         if config.add_text_filter(text):
-            await update.message.reply_text(f"✅ Added text filter: {text}")
+            await message.reply_text(f"✅ Added text filter: {text}")
         else:
-            await update.message.reply_text(f"⚠️ Text filter already exists: {text}")
+            await message.reply_text(f"⚠️ Text filter already exists: {text}")
     
-    async def removetext_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+    async def removetext_command(self, message: Message, context: ContextTypes.DEFAULT_TYPE):
         """Handle /removetext command."""
-        if not self._check_authorization(update):
-            await update.message.reply_text("⛔ Unauthorized access.")
-            return
-        
         if not context.args:
-            await update.message.reply_text("Usage: /removetext <keyword>")
+            await message.reply_text("Usage: /removetext <keyword>")
             return
         
         text = " ".join(context.args)
         if config.remove_text_filter(text):
-            await update.message.reply_text(f"✅ Removed text filter: {text}")
+            await message.reply_text(f"✅ Removed text filter: {text}")
         else:
-            await update.message.reply_text(f"⚠️ Text filter not found: {text}")
+            await message.reply_text(f"⚠️ Text filter not found: {text}")
     
-    async def listtexts_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+    async def listtexts_command(self, message: Message, context: ContextTypes.DEFAULT_TYPE):
         """Handle /listtexts command."""
-        if not self._check_authorization(update):
-            await update.message.reply_text("⛔ Unauthorized access.")
-            return
+        texts_text = self._render_list(
+            "market_text_filters",
+            "🔍 Text Filters:\n\n",
+            config.market_text_filters,
+            "No text filters configured."
+        )
         
-        if config.market_text_filters:
-            texts_text = "🔍 Text Filters:\n\n" + "\n".join(
-                f"{i+1}. {text}" for i, text in enumerate(config.market_text_filters)
-            )
-        else:
-            texts_text = "No text filters configured."
+        await message.reply_text(texts_text)
+    
+    async def _parse_or_reject(
+        self,
+        message: Message,
+        args: Optional[List[str]],
+        caster: Union[Type[int], Type[float]],
+        usage: str,
+        invalid: str
+    ) -> Any:
+        """Parse the first command argument as a number, replying on bad input.
         
-        await update.message.reply_text(texts_text)
+        Args:
+            message: Message to reply to
+            args: Command arguments
+            caster: int or float
+            usage: Reply when no argument was given
+            invalid: Reply when the argument is not a number of that type
+            
+        Returns:
+            The parsed number, or None if a reply was sent instead
+        """
+        if not args:
+            await message.reply_text(usage)
+            return None
+        arg = args[0]
+        if not _NUMBER_RES[caster].match(arg):
+            await message.reply_text(invalid)
+            return None
+        return caster(arg)
     
-    async def setminvalue_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+    async def setminvalue_command(self, message: Message, context: ContextTypes.DEFAULT_TYPE):
         """Handle /setminvalue command."""
-        if not self._check_authorization(update):
-            await update.message.reply_text("⛔ Unauthorized access.")
-            return
-        
-        if not context.args:
-            await update.message.reply_text("Usage: /setminvalue <value>")
+        value = await self._parse_or_reject(
+            message, context.args, float,
+            "Usage: /setminvalue <value>",
+            "⚠️ Invalid value. Please provide a number."
+        )
+        if value is None:
             return
-        
-        try:
-            value = float(context.args[0])
-            config.set_min_trade_value(value)
-            await update.message.reply_text(f"✅ Set minimum trade value to: ${value}")
-        except ValueError:
-            await update.message.reply_text("⚠️ Invalid value. Please provide a number.")
+        config.set_min_trade_value(value)
+        await message.reply_text(f"✅ Set minimum trade value to: ${value}")
     
-    async def setinterval_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+    async def setinterval_command(self, message: Message, context: ContextTypes.DEFAULT_TYPE):
         """Handle /setinterval command."""
-        if not self._check_authorization(update):
-            await update.message.reply_text("⛔ Unauthorized access.")
-            return
-        
-        if not context.args:
-            await update.message.reply_text("Usage: /setinterval <seconds>")
+        interval = await self._parse_or_reject(
+            message, context.args, int,
+            "Usage: /setinterval <seconds>",
+            "⚠️ Invalid interval. Please provide a number."
+        )
+        if interval is None:
             return
-        
-        try:
-            interval = int(context.args[0])
-            config.set_poll_interval(interval)
-            await update.message.reply_text(f"✅ Set poll interval to: {config.poll_interval}s")
-        except ValueError:
-            await update.message.reply_text("⚠️ Invalid interval. Please provide a number.")
+        config.set_poll_interval(interval)
+        await message.reply_text(f"✅ Set poll interval to: {config.poll_interval}s")
     
-    async def setheartbeat_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+    async def setheartbeat_command(self, message: Message, context: ContextTypes.DEFAULT_TYPE):
         """Handle /setheartbeat command."""
-        if not self._check_authorization(update):
-            await update.message.reply_text("⛔ Unauthorized access.")
-            return
-        
-        if not context.args:
-            await update.message.reply_text("Usage: /setheartbeat <seconds>")
+        interval = await self._parse_or_reject(
+            message, context.args, int,
+            "Usage: /setheartbeat <seconds>",
+            "⚠️ Invalid interval. Please provide a number."
+        )
+        if interval is None:
             return
-        
-        try:
-            interval = int(context.args[0])
-            config.set_heartbeat_interval(interval)
-            await update.message.reply_text(
-                f"✅ Set heartbeat interval to: {config.heartbeat_interval}s"
-            )
-        except ValueError:
-            await update.message.reply_text("⚠️ Invalid interval. Please provide a number.")
+        config.set_heartbeat_interval(interval)
+        await message.reply_text(
+            f"✅ Set heartbeat interval to: {config.heartbeat_interval}s"
+        )
     
-    async def addmex_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+    async def addmex_command(self, message: Message, context: ContextTypes.DEFAULT_TYPE):
         """Handle /addmex command."""
-        if not self._check_authorization(update):
-            await update.message.reply_text("⛔ Unauthorized access.")
-            return
-        
         if not context.args:
-            await update.message.reply_text("Usage: /addmex <market_id>")
+            await message.reply_text("Usage: /addmex <market_id>")
             return
         
         market_id = context.args[0]
         if config.add_exclude_market_id(market_id):
-            await update.message.reply_text(f"✅ Added market exclusion: {market_id}")
+            await message.reply_text(f"✅ Added market exclusion: {market_id}")
         else:
-            await update.message.reply_text(f"⚠️ Market exclusion already exists: {market_id}")
+            await message.reply_text(f"⚠️ Market exclusion already exists: {market_id}")
     
-    async def removemex_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+    async def removemex_command(self, message: Message, context: ContextTypes.DEFAULT_TYPE):
         """Handle /removemex command."""
-        if not self._check_authorization(update):
-            await update.message.reply_text("⛔ Unauthorized access.")
-            return
-        
         if not context.args:
-            await update.message.reply_text("Usage: /removemex <market_id>")
+            await message.reply_text("Usage: /removemex <market_id>")
             return
         
         market_id = context.args[0]
         if config.remove_exclude_market_id(market_id):
-            await update.message.reply_text(f"✅ Removed market exclusion: {market_id}")
+            await message.reply_text(f"✅ Removed market exclusion: {market_id}")
         else:
-            await update.message.reply_text(f"⚠️ Market exclusion not found: {market_id}")
+            await message.reply_text(f"⚠️ Market exclusion not found: {market_id}")
     
-    async def listmex_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+    async def listmex_command(self, message: Message, context: ContextTypes.DEFAULT_TYPE):
         """Handle /listmex command."""
-        if not self._check_authorization(update):
-            await update.message.reply_text("⛔ Unauthorized access.")
-            return
-        
-        if config.exclude_market_ids:
-            exclusions_text = "🚫 Excluded Market IDs:\n\n" + "\n".join(
-                f"{i+1}. {mid}" for i, mid in enumerate(config.exclude_market_ids)
-            )
-        else:
-            exclusions_text = "No market ID exclusions configured."
+        exclusions_text = self._render_list(
+            "exclude_market_ids",
+            "🚫 Excluded Market IDs:\n\n",
+            config.exclude_market_ids,
+            "No market ID exclusions configured."
+        )
         
-        await update.message.reply_text(exclusions_text)
+        await message.reply_text(exclusions_text)
     
-    async def addtex_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+    async def addtex_command(self, message: Message, context: ContextTypes.DEFAULT_TYPE):
         """Handle /addtex command."""
-        if not self._check_authorization(update):
-            await update.message.reply_text("⛔ Unauthorized access.")
-            return
-        
         if not context.args:
-            await update.message.reply_text("Usage: /addtex <keyword>")
+            await message.reply_text("Usage: /addtex <keyword>")
             return
         
         text = " ".join(context.args)
         if config.add_exclude_text_filter(text):
-            await update.message.reply_text(f"✅ Added text exclusion: {text}")
+            await message.reply_text(f"✅ Added text exclusion: {text}")
         else:
-            await update.message.reply_text(f"⚠️ Text exclusion already exists: {text}")
+            await message.reply_text(f"⚠️ Text exclusion already exists: {text}")
     
-    async def removetex_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+    async def removetex_command(self, message: Message, context: ContextTypes.DEFAULT_TYPE):
         """Handle /removetex command."""
-        if not self._check_authorization(update):
-            await update.message.reply_text("⛔ Unauthorized access.")
-            return
-        
         if not context.args:
-            await update.message.reply_text("Usage: /removetex <keyword>")
+            await message.reply_text("Usage: /removetex <keyword>")
             return
         
         text = " ".join(context.args)
         if config.remove_exclude_text_filter(text):
-            await update.message.reply_text(f"✅ Removed text exclusion: {text}")
+            await message.reply_text(f"✅ Removed text exclusion: {text}")
         else:
-            await update.message.reply_text(f"⚠️ Text exclusion not found: {text}")
+            await message.reply_text(f"⚠️ Text exclusion not found: {text}")
     
-    async def listtex_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+    async def listtex_command(self, message: Message, context: ContextTypes.DEFAULT_TYPE):
         """Handle /listtex command."""
-        if not self._check_authorization(update):
-            await update.message.reply_text("⛔ Unauthorized access.")
-            return
+        exclusions_text = self._render_list(
+            "exclude_market_text_filters",
+            "🚫 Excluded Text Filters:\n\n",
+            config.exclude_market_text_filters,
+            "No text exclusions configured."
+        )
         
-        if config.exclude_market_text_filters:
-            exclusions_text = "🚫 Excluded Text Filters:\n\n" + "\n".join(
-                f"{i+1}. {text}" for i, text in enumerate(config.exclude_market_text_filters)
-            )
-        else:
-            exclusions_text = "No text exclusions configured."
+        await message.reply_text(exclusions_text)
+    
+    def send_notification(self, message: str):
+        """Queue a notification message for the allowed chat.
         
-        await update.message.reply_text(exclusions_text)
+        Returns immediately; the outbox task delivers queued messages.
+        """
+        try:
+            self._outbox.put_nowait(message)
+        except asyncio.QueueFull:
+            logger.warning(f"Notification outbox full, dropping message for chat {self.allowed_chat_id}")
     
-    async def send_notification(self, message: str):
-        """Send a notification message to the allowed chat."""
-        if self.application:
+    async def _drain_outbox(self):
+        """Deliver queued notifications, batching bursts into as few messages as fit."""
+        carry: Optional[str] = None
+        while True:
+            message = carry if carry is not None else await self._outbox.get()
+            carry = None
+            batch = [message]
+            size = _utf16_len(message)
+            while not self._outbox.empty():
+                message = self._outbox.get_nowait()
+                size += _SEPARATOR_LEN + _utf16_len(message)
+                if size > MessageLimit.MAX_TEXT_LENGTH:
+                    carry = message
+                    break
+                batch.append(message)
+            try:
+                if not await self._send_text(_BATCH_SEPARATOR.join(batch)) and len(batch) > 1:
+                    # Resend one by one so a rejected batch doesn't lose every alert in it
+                    for message in batch:
+                        await asyncio.sleep(OUTBOX_INTERVAL)
+                        await self._send_text(message)
+            finally:
+                for _ in batch:
+                    self._outbox.task_done()
+            await asyncio.sleep(OUTBOX_INTERVAL)
+    
+    async def _send_text(self, text: str) -> bool:
+        """Send one message to the allowed chat, logging any failure.
+        
+        Returns:
+            True if the message was sent
+        """
+        if self.application is None:
+            return False
+        try:
+            await self.application.bot.send_message(chat_id=self.allowed_chat_id, text=text)
+        except Exception:
+            logger.exception(f"Failed to send notification to chat {self.allowed_chat_id}")
+            return False
+        return True
+    
+    async def _keepalive_loop(self):
+        """Ping the Bot API so the pooled connection stays open while idle."""
+        while True:
+            await asyncio.sleep(KEEPALIVE_INTERVAL)
             try:
-                await self.application.bot.send_message(
-                    chat_id=self.allowed_chat_id,
-                    text=message
-                )
+                await self.application.bot.get_me()
             except Exception as e:
-                logger.error(f"Failed to send notification to chat {self.allowed_chat_id}: {e}", exc_info=True)
+                logger.debug(f"Keepalive request failed: {e}")
     
     async def start(self):
         """Start the Telegram bot."""
-        self.application = Application.builder().token(self.token).build()
+        # Commands are independent, so let a slow reply not hold up the rest.
+        # Outgoing calls share a large HTTP/2 pool; getUpdates only ever has
+        # one long poll in flight, so it keeps the default pool size.
+        self.application = (
+            Application.builder()
+            .token(self.token)
+            .request(HTTPXRequest(
+                http_version="2",
+                httpx_kwargs={
+                    "limits": httpx.Limits(max_connections=256, keepalive_expiry=_KEEPALIVE_EXPIRY)
+                },
+            ))
+            .get_updates_request(HTTPXRequest(http_version="2"))
+            .concurrent_updates(True)
+            .build()
+        )
 
-        # Add command handlers
-        self.application.add_handler(CommandHandler("start", self.start_command))
-        self.application.add_handler(CommandHandler("help", self.help_command))
-        self.application.add_handler(CommandHandler("status", self.status_command))
-        self.application.add_handler(CommandHandler("addwhale", self.addwhale_command))
-        self.application.add_handler(CommandHandler("removewhale", self.removewhale_command))
-        self.application.add_handler(CommandHandler("listwhales", self.listwhales_command))
-        self.application.add_handler(CommandHandler("addmarket", self.addmarket_command))
-        self.application.add_handler(CommandHandler("removemarket", self.removemarket_command))
-        self.application.add_handler(CommandHandler("listmarkets", self.listmarkets_command))
-        self.application.add_handler(CommandHandler("addtext", self.addtext_command))
-        self.application.add_handler(CommandHandler("removetext", self.removetext_command))
-        self.application.add_handler(CommandHandler("listtexts", self.listtexts_command))
-        self.application.add_handler(CommandHandler("setminvalue", self.setminvalue_command))
-        self.application.add_handler(CommandHandler("setinterval", self.setinterval_command))
-        self.application.add_handler(CommandHandler("setheartbeat", self.setheartbeat_command))
-        self.application.add_handler(CommandHandler("addmex", self.addmex_command))
-        self.application.add_handler(CommandHandler("removemex", self.removemex_command))
-        self.application.add_handler(CommandHandler("listmex", self.listmex_command))
-        self.application.add_handler(CommandHandler("addtex", self.addtex_command))
-        self.application.add_handler(CommandHandler("removetex", self.removetex_command))
-        self.application.add_handler(CommandHandler("listtex", self.listtex_command))
+        # Only the allowed chat reaches the command handlers
+        allowed = filters.Chat(chat_id=self.allowed_chat_id)
+        
+        # A single handler routes every command through the command map
+        self.application.add_handler(MessageHandler(filters.COMMAND & allowed, self._dispatch))
+        # Commands from any other chat only get a rejection notice
+        self.application.add_handler(MessageHandler(filters.COMMAND & ~allowed, self._reject))
 
-        # Initialize and start the application so handlers are active
+        # Initialize and start the application so handlers are active.
+        # initialize() fetches the bot user with getMe, which also opens
+        # the pooled connection before the first notification goes out.
         await self.application.initialize()
         await self.application.start()
+        self._outbox_task = asyncio.create_task(self._drain_outbox())
+        self._keepalive_task = asyncio.create_task(self._keepalive_loop())
 
-        # Start polling in a background task (async, non-blocking)
+        # Start polling in a background task (async, non-blocking). Long polls
+        # keep an idle bot at one getUpdates call per 50s, and startup keeps
+        # retrying until Telegram is reachable.
         self._polling_task = asyncio.create_task(
-            self.application.updater.start_polling(drop_pending_updates=True)
+            self.application.updater.start_polling(
+                drop_pending_updates=config.drop_pending_updates,
+                timeout=50,
+                poll_interval=0.0,
+                bootstrap_retries=-1,
+            )
         )
 
     async def stop(self):
         """Stop the Telegram bot."""
+        if self._keepalive_task:
+            await _cancel_task(self._keepalive_task, "keepalive task")
+            self._keepalive_task = None
+        if self._outbox_task:
+            # Give already queued notifications a chance to go out
+            try:
+                await asyncio.wait_for(self._outbox.join(), timeout=OUTBOX_DRAIN_TIMEOUT)
+            except asyncio.TimeoutError:
+                logger.warning(f"Dropping {self._outbox.qsize()} queued notifications on shutdown")
+            await _cancel_task(self._outbox_task, "outbox task")
+            self._outbox_task = None
         if self._polling_task:
-            self._polling_task.cancel()
-            with contextlib.suppress(asyncio.CancelledError):
-                await self._polling_task
+            await _cancel_task(self._polling_task, "polling task")
             self._polling_task = None
         if self.application:
-            # Stop polling and application lifecycle
-            await self.application.updater.stop()
-            await self.application.stop()
-            await self.application.shutdown()
+            # Stop polling and application lifecycle; PTB requires this order,
+            # so each step is bounded rather than run concurrently
+            await _bounded(self.application.updater.stop(), "updater stop")
+            await _bounded(self.application.stop(), "application stop")
+            await _bounded(self.application.shutdown(), "application shutdown")
             self.application = None